@@ -12,20 +12,24 @@ Architecture:
 processing. It should be customized for production use.
 
 Usage:
-    python server.py
+    python server.py        # uvloop + httptools, several workers
+    python server.py --dev  # single worker with auto-reload
 
     Or with uvicorn directly:
     uvicorn server:app --reload --host 0.0.0.0 --port 8000
 """
 
-import tempfile
-import subprocess
-from pathlib import Path
+import copy
+import hashlib
+import io
+import threading
+from collections import OrderedDict
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 import ezdxf
@@ -40,7 +44,8 @@ import numpy as np
 app = FastAPI(
     title="GeoGebra Export Server",
     description="Example server for SVG→DXF conversion using vpype (optimization) and ezdxf (DXF generation)",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse  # orjson (Rust) encoder for JSON responses
 )
 
 # CORS configuration (allow requests from frontend)
@@ -52,13 +57,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Supported formats (frozensets for O(1) lookups)
+SOURCE_FORMATS = frozenset({'svg', 'png', 'json'})
+OUTPUT_FORMATS = frozenset({'dxf'})
+DXF_FORMATS = frozenset({'ascii', 'bin'})  # Binary DXF: smaller and faster to write
+
+# DXF $INSUNITS codes (units metadata for CAD software display)
+UNITS_CODES = {
+    'mm': 4,    # Millimeters
+    'cm': 5,    # Centimeters
+    'inch': 1,  # Inches
+    'm': 6      # Meters
+}
+
+# vpype linesimplify default tolerance (CSS pixels)
+SIMPLIFY_TOLERANCE = vp.convert_length('0.05mm')
+
+# Below these sizes, linemerge + linesimplify cost more than they save
+OPTIMIZE_MIN_SEGMENTS = 500
+OPTIMIZE_MAX_LAYERS = 4
+
+# Parsed/optimized vpype documents, keyed by (SVG digest, tolerance or None), LRU
+DOCUMENT_CACHE_SIZE = 16
+document_cache = OrderedDict()
+document_cache_lock = threading.Lock()  # Conversions run in the threadpool
+
 
 # ============================================================================
 # Request/Response Models
 # ============================================================================
 
 class ExportRequest(BaseModel):
-    """Request body for export processing."""
+    """Request body for export processing (validated by pydantic v2's Rust core)."""
     format: str  # Source format: 'svg', 'png', 'json'
     data: str  # Source data content
     outputFormat: str  # Desired output format: 'dxf', etc.
@@ -85,19 +115,9 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    # Check if vpype is available (used for optimization)
-    try:
-        result = subprocess.run(
-            ["vpype", "--version"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        vpype_version = result.stdout.strip()
-        vpype_available = result.returncode == 0
-    except Exception as e:
-        vpype_version = str(e)
-        vpype_available = False
+    # vpype is used in-process (optimization), report the imported version
+    vpype_version = f"vpype {vp.__version__}"
+    vpype_available = True
 
     # Check if ezdxf is available (used for DXF generation)
     try:
@@ -145,22 +165,25 @@ async def process_export(request: ExportRequest):
     }
     """
 
+    source_format = request.format.lower()
+    output_format = request.outputFormat.lower()
+
     # Validate source format
-    if request.format.lower() not in ['svg', 'png', 'json']:
+    if source_format not in SOURCE_FORMATS:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported source format: {request.format}. Supported: svg, png, json"
         )
 
     # Validate output format
-    if request.outputFormat.lower() not in ['dxf']:
+    if output_format not in OUTPUT_FORMATS:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported output format: {request.outputFormat}. Supported: dxf"
         )
 
     # Route to appropriate converter
-    if request.format.lower() == 'svg' and request.outputFormat.lower() == 'dxf':
+    if source_format == 'svg' and output_format == 'dxf':
         return await convert_svg_to_dxf(request.data, request.options)
     else:
         raise HTTPException(
@@ -174,155 +197,215 @@ async def process_export(request: ExportRequest):
 # ============================================================================
 
 
+def optimize_document(doc: vp.Document, tolerance: float) -> None:
+    """
+    Merge and simplify the lines of every layer in place.
+
+    Equivalent to the `vpype linemerge --tolerance <tolerance> linesimplify`
+    pipeline, without spawning the vpype CLI or re-parsing an intermediate SVG.
+
+    Args:
+        doc: vpype document to optimize
+        tolerance: linemerge tolerance (CSS pixels, see vp.convert_length)
+    """
+    for layer_id in list(doc.layers):
+        lines = doc.layers[layer_id]
+        lines.merge(tolerance=tolerance, flip=True)
+
+        if len(lines) > 0:
+            # preserve_topology=False so that self-intersecting paths are simplified too
+            mls = lines.as_mls().simplify(tolerance=SIMPLIFY_TOLERANCE, preserve_topology=False)
+            doc.replace(lines.clone(mls), layer_id)
+
+
+def get_cached_document(key: tuple) -> Optional[vp.Document]:
+    """Return a cached vpype document (marked as most recently used) or None."""
+    with document_cache_lock:
+        doc = document_cache.get(key)
+        if doc is not None:
+            document_cache.move_to_end(key)
+        return doc
+
+
+def cache_document(key: tuple, doc: vp.Document) -> None:
+    """Store a vpype document, evicting the least recently used ones."""
+    with document_cache_lock:
+        document_cache[key] = doc
+        document_cache.move_to_end(key)
+        while len(document_cache) > DOCUMENT_CACHE_SIZE:
+            document_cache.popitem(last=False)
+
+
+def load_document(svg_content: str, optimize: bool, tolerance_str: str) -> vp.Document:
+    """
+    Parse and optionally optimize an SVG, reusing cached documents.
+
+    Parsing only depends on the SVG content, so exporting the same drawing
+    again (e.g. with another scale or units) skips vpype entirely.
+    The returned document is shared with the cache and must not be modified.
+    """
+    digest = hashlib.blake2b(svg_content.encode('utf-8'), digest_size=16).digest()
+
+    doc = get_cached_document((digest, None))
+    if doc is None:
+        # Read SVG from memory using vpype Python API
+        doc = vp.read_multilayer_svg(io.StringIO(svg_content), quantization=0.1)
+        cache_document((digest, None), doc)
+
+    # Apply optimization in-process (same as `vpype linemerge linesimplify`),
+    # skipped for small documents (typical GeoGebra exports)
+    is_small = doc.segment_count() < OPTIMIZE_MIN_SEGMENTS and len(doc.layers) <= OPTIMIZE_MAX_LAYERS
+    if not optimize or is_small:
+        return doc
+
+    optimized = get_cached_document((digest, tolerance_str))
+    if optimized is None:
+        optimized = copy.deepcopy(doc)  # Keep the cached parsed document intact
+        optimize_document(optimized, vp.convert_length(tolerance_str))
+        cache_document((digest, tolerance_str), optimized)
+    return optimized
+
+
+def convert_svg_to_dxf_sync(svg_content: str, options: dict) -> io.BytesIO:
+    """
+    Blocking SVG → DXF conversion (vpype parsing, optimization, ezdxf output).
+
+    CPU-bound: called from a worker thread by convert_svg_to_dxf so the event
+    loop keeps serving other requests. See convert_svg_to_dxf for options.
+
+    Returns:
+        In-memory buffer holding the DXF file content
+    """
+
+    # Extract options
+    tolerance_str = options.get('tolerance', '0.01mm')
+    optimize = options.get('optimize', True)
+    scale = options.get('scale', 1.0)
+    units = options.get('units', 'mm')
+    dxf_format = options.get('dxfFormat', 'ascii').lower()
+
+    # Parsed (and optimized) vpype document, from cache when possible
+    doc = load_document(svg_content, optimize, tolerance_str)
+
+    # Create DXF document
+    dxf_doc = ezdxf.new('R2010')
+    msp = dxf_doc.modelspace()
+
+    # Set DXF units metadata (for CAD software display)
+    units_code = UNITS_CODES.get(units.lower())
+    if units_code is not None:
+        dxf_doc.header['$INSUNITS'] = units_code
+
+    # Convert vpype document to DXF
+    path_count = 0
+    for layer_id in doc.layers:
+        # Keep vpype layers as DXF layers (one shared attribs dict per layer)
+        layer_name = str(layer_id)
+        if layer_name not in dxf_doc.layers:
+            dxf_doc.layers.add(layer_name)
+        attribs = {'layer': layer_name}
+
+        # Only lines with at least 2 points can become polylines
+        lines = [line for line in doc.layers[layer_id] if len(line) >= 2]
+
+        for line in lines:
+            # Convert vpype line (complex numbers) to LWPOLYLINE vertices:
+            # (N, 5) array of (x, y, start_width, end_width, bulge)
+            coords = np.asarray(line)
+            vertices = np.zeros((coords.size, 5), dtype=np.float64)
+            np.multiply(coords.real, scale, out=vertices[:, 0])
+            np.multiply(coords.imag, -scale, out=vertices[:, 1])  # Flip Y axis (SVG vs DXF)
+
+            # Add polyline to DXF, setting all vertices at once: add_lwpolyline(points)
+            # formats and appends (np.concatenate) points one by one
+            polyline = msp.add_lwpolyline((), dxfattribs=attribs)
+            polyline.lwpoints.set(vertices)
+
+        path_count += len(lines)
+
+    print(f"Converted {path_count} paths to DXF (optimize={optimize}, scale={scale}, units={units})")
+
+    # Write DXF straight into a single in-memory binary buffer
+    dxf_buffer = io.BytesIO()
+    if dxf_format == 'bin':
+        dxf_doc.write(dxf_buffer, fmt='bin')
+    else:
+        dxf_stream = io.TextIOWrapper(dxf_buffer, encoding=dxf_doc.output_encoding, errors='dxfreplace')
+        dxf_doc.write(dxf_stream)
+        dxf_stream.detach()  # Flush and keep dxf_buffer open
+
+    return dxf_buffer
+
+
+def iter_buffer(buffer: io.BytesIO, chunk_size: int = 64 * 1024):
+    """
+    Yield the content of a buffer chunk by chunk (for StreamingResponse).
+
+    Reads through a memoryview so the whole content is never copied at once.
+    """
+    view = buffer.getbuffer()
+    try:
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    finally:
+        view.release()
+
+
 async def convert_svg_to_dxf(svg_content: str, options: dict) -> Response:
     """
     Convert SVG to DXF using vpype (Python API) and ezdxf.
 
     Uses vpype Python API for reading SVG and optional optimization,
-    then converts to DXF using ezdxf.
+    then converts to DXF using ezdxf. The conversion runs in the threadpool.
 
     Options:
         tolerance (str): Simplification tolerance for vpype (e.g., "0.01mm")
         optimize (bool): Apply vpype linemerge and linesimplify
         scale (float): Scale factor for coordinates (1.0 = 1:1, 0.264 ≈ px to mm)
         units (str): Units metadata for DXF (mm, cm, inch) - display only
+        dxfFormat (str): DXF encoding, 'ascii' (default) or 'bin' (binary DXF)
     """
-
-    # Extract options
-    tolerance_str = options.get('tolerance', '0.01mm')
-    optimize = options.get('optimize', True)
-    scale = options.get('scale', 1.0)
-    units = options.get('units', 'mm')
+    dxf_format = str(options.get('dxfFormat', 'ascii')).lower()
+    if dxf_format not in DXF_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported DXF format: {dxf_format}. Supported: ascii, bin"
+        )
 
     try:
-        # Write SVG to temporary file (vpype needs a file path)
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.svg', delete=False, encoding='utf-8') as tmp_svg:
-            tmp_svg.write(svg_content)
-            tmp_svg_path = tmp_svg.name
-
-        try:
-            # Apply optimization using vpype CLI if requested
-            if optimize:
-                # Create optimized SVG file path
-                optimized_svg_path = tmp_svg_path.replace('.svg', '_optimized.svg')
-
-                # Build vpype CLI command for optimization
-                cmd = [
-                    'vpype',
-                    'read', tmp_svg_path,
-                    'linemerge', '--tolerance', tolerance_str,
-                    'linesimplify',
-                    'write', optimized_svg_path
-                ]
-
-                # Execute vpype CLI
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-
-                if result.returncode != 0:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"vpype optimization failed: {result.stderr}"
-                    )
-
-                # Use optimized SVG
-                svg_to_read = optimized_svg_path
-            else:
-                # Use original SVG
-                svg_to_read = tmp_svg_path
-
-            # Read SVG using vpype Python API
-            doc = vp.read_multilayer_svg(svg_to_read, quantization=0.1)
-
-            # Create DXF document
-            dxf_doc = ezdxf.new('R2010')
-            msp = dxf_doc.modelspace()
-
-            # Set DXF units metadata (for CAD software display)
-            units_codes = {
-                'mm': 4,    # Millimeters
-                'cm': 5,    # Centimeters
-                'inch': 1,  # Inches
-                'm': 6      # Meters
-            }
-            if units.lower() in units_codes:
-                dxf_doc.header['$INSUNITS'] = units_codes[units.lower()]
-
-            # Convert vpype document to DXF
-            path_count = 0
-            for layer_id in doc.layers:
-                layer = doc.layers[layer_id]
-
-                for line in layer:
-                    # Convert vpype line (complex numbers) to DXF points
-                    coords = np.array(line)
-                    points = []
-
-                    for coord in coords:
-                        x = coord.real * scale
-                        y = -coord.imag * scale  # Flip Y axis (SVG vs DXF)
-                        points.append((x, y))
-
-                    # Add polyline to DXF
-                    if len(points) >= 2:
-                        msp.add_lwpolyline(points)
-                        path_count += 1
-
-            print(f"Converted {path_count} paths to DXF (optimize={optimize}, scale={scale}, units={units})")
-
-            # Save DXF to BytesIO (in-memory)
-            from io import BytesIO
-            dxf_buffer = BytesIO()
-
-            # Save to temporary file then read (ezdxf doesn't support BytesIO directly for all versions)
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.dxf', delete=False) as tmp_dxf:
-                tmp_dxf_path = tmp_dxf.name
-
-            dxf_doc.saveas(tmp_dxf_path)
-
-            with open(tmp_dxf_path, 'rb') as f:
-                dxf_content = f.read()
-
-            # Cleanup temp DXF
-            Path(tmp_dxf_path).unlink()
-
-            # Return DXF file
-            return Response(
-                content=dxf_content,
-                media_type='application/dxf',
-                headers={
-                    'Content-Disposition': 'attachment; filename="geogebra-export.dxf"'
-                }
-            )
-
-        finally:
-            # Cleanup temp SVG files
-            Path(tmp_svg_path).unlink()
-
-            # Cleanup optimized SVG if it exists
-            if optimize:
-                optimized_svg_path = tmp_svg_path.replace('.svg', '_optimized.svg')
-                if Path(optimized_svg_path).exists():
-                    Path(optimized_svg_path).unlink()
-
+        dxf_buffer = await run_in_threadpool(convert_svg_to_dxf_sync, svg_content, options)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"SVG to DXF conversion failed: {str(e)}"
         )
 
+    # Stream DXF file
+    return StreamingResponse(
+        iter_buffer(dxf_buffer),
+        media_type='application/dxf',
+        headers={
+            'Content-Disposition': 'attachment; filename="geogebra-export.dxf"',
+            'Content-Length': str(dxf_buffer.getbuffer().nbytes)
+        }
+    )
+
 
 # ============================================================================
 # Main Entry Point
 # ============================================================================
 
 if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
     import uvicorn
 
+    parser = argparse.ArgumentParser(description="GeoGebra Export Server")
+    parser.add_argument("--dev", action="store_true", help="Single worker with auto-reload")
+    args = parser.parse_args()
+
     print("""
     ╔═══════════════════════════════════════════════════════════════╗
     ║       GeoGebra Export Server - Example Implementation        ║
@@ -338,10 +421,22 @@ if __name__ == "__main__":
     ╚═══════════════════════════════════════════════════════════════╝
     """)
 
-    uvicorn.run(
-        "server:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    if args.dev:
+        uvicorn.run(
+            "server:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        # uvloop / httptools are installed by uvicorn[standard] (uvloop is not available on Windows)
+        uvicorn.run(
+            "server:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
+            workers=max(1, (os.cpu_count() or 1) // 2),
+            log_level="info"
+        )
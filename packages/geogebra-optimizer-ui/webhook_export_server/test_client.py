@@ -14,6 +14,7 @@ Requirements:
 
 import requests
 from pathlib import Path
+from typing import Optional
 
 
 def convert_svg_to_dxf(
@@ -23,7 +24,8 @@ def convert_svg_to_dxf(
     optimize: bool = True,
     tolerance: str = "0.01mm",
     scale: float = 1.0,
-    units: str = "mm"
+    units: str = "mm",
+    session: Optional[requests.Session] = None
 ):
     """
     Convert SVG to DXF using the export server.
@@ -36,6 +38,7 @@ def convert_svg_to_dxf(
         tolerance: Simplification tolerance for vpype
         scale: Scale factor (1.0 = 1:1, 0.264 ≈ px→mm)
         units: Units metadata for DXF (mm, cm, inch)
+        session: HTTP session to reuse (keeps the connection alive between calls)
     """
     # Read SVG file
     svg_file = Path(svg_path)
@@ -65,8 +68,10 @@ def convert_svg_to_dxf(
     print(f"  Scale: {scale}")
     print(f"  Units: {units}")
 
+    http = session or requests
+
     try:
-        response = requests.post(
+        response = http.post(
             f"{server_url}/api/process",
             json=payload,
             timeout=60  # 60 seconds timeout
@@ -115,10 +120,13 @@ def main():
     svg_input = "hexagone_test.svg"
     server_url = "http://localhost:8000"
 
+    # Single session: all requests reuse the same TCP connection
+    session = requests.Session()
+
     # Check server health
     print("Checking server health...")
     try:
-        health = requests.get(f"{server_url}/health", timeout=5)
+        health = session.get(f"{server_url}/health", timeout=5)
         health_data = health.json()
         print(f"Server status: {health_data.get('status')}")
 
@@ -145,7 +153,8 @@ def main():
         optimize=True,
         tolerance="0.001mm",
         scale=1.0,
-        units="mm"
+        units="mm",
+        session=session
     )
 
     print()
@@ -162,9 +171,12 @@ def main():
         optimize=False,
         tolerance="0.001mm",
         scale=1.0,
-        units="mm"
+        units="mm",
+        session=session
     )
 
+    session.close()
+
     print()
     print("=" * 70)
     print("SUMMARY")
@@ -1,6 +1,25 @@
 """
 Fonctions de calcul de fitness pour l'optimisation
 """
+import numpy as np
+
+
+_scratch = None  # Buffer réutilisé pour les écarts (évite une allocation par appel)
+
+
+def _delta(current_values, initial_values):
+    """
+    Calcule les écarts current - initial dans le buffer partagé
+
+    Returns:
+        np.ndarray (vue sur le buffer, écrasée au prochain appel)
+    """
+    global _scratch
+    # Pas de copie si l'appelant passe déjà un np.ndarray float64
+    initial = np.asarray(initial_values, dtype=np.float64)
+    if _scratch is None or _scratch.shape != initial.shape:
+        _scratch = np.empty_like(initial)
+    return np.subtract(current_values, initial, out=_scratch)
 
 
 def calculate_regularization_penalty(current_values, initial_values):
@@ -9,16 +28,14 @@ def calculate_regularization_penalty(current_values, initial_values):
 
     Args:
         current_values: Valeurs actuelles des paramètres
-        initial_values: Valeurs initiales des paramètres
+        initial_values: Valeurs initiales des paramètres (un np.ndarray
+            float64 converti une fois par l'appelant évite toute conversion)
 
     Returns:
         Somme des carrés des écarts
     """
-    penalty = 0.0
-    for i in range(len(current_values)):
-        diff = current_values[i] - initial_values[i]
-        penalty += diff * diff
-    return penalty
+    diff = _delta(current_values, initial_values)
+    return float(diff @ diff)
 
 
 def calculate_total_delta(current_values, initial_values):
@@ -27,12 +44,10 @@ def calculate_total_delta(current_values, initial_values):
 
     Args:
         current_values: Valeurs actuelles
-        initial_values: Valeurs initiales
+        initial_values: Valeurs initiales (np.ndarray float64 de préférence)
 
     Returns:
         Somme des |Δ|
     """
-    total = 0.0
-    for i in range(len(current_values)):
-        total += abs(current_values[i] - initial_values[i])
-    return total
+    diff = _delta(current_values, initial_values)
+    return float(np.abs(diff, out=diff).sum())
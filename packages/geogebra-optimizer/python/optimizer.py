@@ -1,17 +1,249 @@
 """
 CMA-ES optimizer for GeoGebra with hard constraints (ConstrainedFitnessAL)
 """
+import base64
 import cma
+import functools
 import json
+import numpy as np
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from cma.restricted_gaussian_sampler import GaussVkDSampler
+from cma.transformations import DiagonalDecoding
+
+try:
+    import cmaes  # Optional lighter backend (micropip.install('cmaes'))
+except ImportError:
+    cmaes = None
+
+try:
+    import orjson  # Optional C JSON encoder
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec  # Optional C JSON encoder (used when orjson is missing)
+except ImportError:
+    msgspec = None
+
+try:
+    from threadpoolctl import threadpool_limits  # Optional BLAS thread control
+except ImportError:
+    threadpool_limits = None
+
+try:
+    from multiprocessing import resource_tracker, shared_memory  # Not available in Pyodide
+except ImportError:
+    resource_tracker = shared_memory = None
 
 
 # Storage for current evaluation values (set from JavaScript)
 _current_objective = None
 _current_constraints = []  # List of constraint values (AL-transformed)
 cfun = None  # ConstrainedFitnessAL instance (set by initialize_optimizer)
+es = None  # CMA-ES optimizer (set from JavaScript, rebound on IPOP/BIPOP restarts)
+
+# Buffers shared with JavaScript (allocated by initialize_optimizer)
+_solutions_buf = None  # Current population, shape (popsize, ndim)
+_fitness_buf = None  # Fitnesses of the current population, shape (popsize,)
+
+# Worker threads for tell_results_pool (None until probed, False when
+# threads cannot be started, e.g. in Pyodide)
+_pool_executor = None
+
+# JSON encoder built once and reused for every payload (see _dumps)
+_json_encoder = msgspec.json.Encoder() if msgspec is not None else None
+
+# Dimension above which the diagonal (separable) covariance is used by default
+SEPARABLE_MIN_DIM = 40
+# Dimension above which the limited-memory (VkD) backend is used by default
+LIMITED_MEMORY_MIN_DIM = 80
+# Element types accepted for the binary ask/tell payloads
+BINARY_DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+
+def _dumps(obj):
+    """Serialize obj to a JSON string (orjson or msgspec when available, json otherwise)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    if _json_encoder is not None:
+        return _json_encoder.encode(obj).decode()
+    return json.dumps(obj)
+
+
+def _binary_dtype(dtype):
+    """Validate a binary payload dtype name"""
+    if dtype not in BINARY_DTYPES:
+        raise ValueError(f"Unsupported binary dtype: {dtype} (expected 'float64' or 'float32')")
+    return BINARY_DTYPES[dtype]
+
+
+def _encode_array(arr, dtype='float64'):
+    """Encode an array as base64 of its row-major bytes in the given dtype"""
+    return base64.b64encode(np.ascontiguousarray(arr, dtype=_binary_dtype(dtype)).tobytes()).decode('ascii')
+
+
+def _decode_array(data, dtype='float64'):
+    """Decode base64 bytes of the given dtype into a flat (read-only) array"""
+    return np.frombuffer(base64.b64decode(data), dtype=_binary_dtype(dtype))
+
+
+class CMAesStrategy:
+    """
+    pycma-like wrapper around a `cmaes` optimizer
+
+    Exposes what this module and ConstrainedFitnessAL use from
+    cma.CMAEvolutionStrategy: popsize, N, countiter, mean, sigma, ask(),
+    tell(solutions, fitnesses) and stop(), plus the covariance C
+    (matrix for cmaes.CMA, diagonal for cmaes.SepCMA) and set_state().
+    """
+
+    def __init__(self, optimizer, maxiter, tolfun):
+        self.optimizer = optimizer
+        self.popsize = optimizer.population_size
+        self.N = optimizer.dim
+        self.maxiter = maxiter
+        self.countiter = 0
+        # cmaes stops on the range of recent function values below _tolfun
+        optimizer._tolfun = tolfun
+
+    @property
+    def mean(self):
+        return self.optimizer.mean
+
+    @property
+    def sigma(self):
+        return self.optimizer._sigma
+
+    @property
+    def C(self):
+        return self.optimizer._C
+
+    def set_state(self, mean, sigma, C=None):
+        """Overwrite the distribution (mean, step size and covariance)"""
+        self.optimizer._mean = np.array(mean, dtype=np.float64)
+        self.optimizer._sigma = float(sigma)
+        if C is not None:
+            self.optimizer._C = np.array(C, dtype=np.float64)
+            # Eigendecomposition is recomputed on the next ask()
+            self.optimizer._B = self.optimizer._D = None
+
+    def ask(self):
+        """Sample a whole population (popsize x N array)"""
+        return np.array([self.optimizer.ask() for _ in range(self.popsize)])
+
+    def tell(self, solutions, fitnesses):
+        """Update the distribution with the evaluated population"""
+        self.optimizer.tell(list(zip(solutions, fitnesses)))
+        self.countiter += 1
+
+    def stop(self):
+        """Return the satisfied stopping criteria (empty dict if none)"""
+        stop = {}
+        if self.countiter >= self.maxiter:
+            stop['maxiter'] = self.maxiter
+        if self.countiter > 0 and self.optimizer.should_stop():
+            stop['should_stop'] = True
+        return stop
 
 
-def initialize_optimizer(initial_guess, bounds_min, bounds_max, sigma=0.5, maxiter=100, popsize=10, tolfun=1e-6, has_constraints=True):
+def _create_strategy(x0, lb, ub, sigma, maxiter, popsize, tolfun, backend, separable, verbose, update_interval):
+    """
+    Build the CMA-ES strategy for the given backend and allocate its
+    population buffer (module globals are left untouched, see _bind_buffers)
+
+    Returns:
+        CMA-ES optimizer
+    """
+    bounds = [lb, ub]
+    dim = x0.size
+
+    opts = {
+        'bounds': bounds,
+        'verb_disp': 1 if verbose else 0,
+        'verb_log': 0,
+        'maxiter': maxiter,
+        'popsize': popsize,
+        'tolfun': tolfun,
+        'CMA_diagonal': bool(separable)
+    }
+    if update_interval > 1:
+        # Eigendecompose C only every update_interval iterations (pycma's
+        # lazy update gap); below that pycma's own default gap is kept
+        opts['updatecovwait'] = update_interval
+
+    if backend == 'cmaes':
+        if cmaes is None:
+            raise ImportError("backend='cmaes' requires the cmaes package")
+        strategy = cmaes.SepCMA if separable else cmaes.CMA
+        es = CMAesStrategy(
+            strategy(
+                mean=x0.copy(),  # SepCMA keeps (and updates) the given array
+                sigma=sigma,
+                bounds=np.column_stack(bounds),
+                population_size=popsize
+            ),
+            maxiter,
+            tolfun
+        )
+    elif backend == 'vkd':
+        # Low-rank + diagonal covariance: keep m = 4 + 3 ln(d) vectors at most
+        opts['CMA_sampler_options'] = {'kmax': min(4 + int(3 * np.log(dim)), dim - 1)}
+        es = cma.CMAEvolutionStrategy(x0, sigma, GaussVkDSampler.extend_cma_options(opts))
+    elif backend == 'pycma':
+        es = cma.CMAEvolutionStrategy(x0, sigma, opts)
+    else:
+        raise ValueError(f"Unknown backend: {backend} (expected 'pycma', 'cmaes' or 'vkd')")
+    es._backend = backend
+    es._x0, es._lb, es._ub = x0, lb, ub
+    es._pending = None  # Population asked and not told yet
+    es._last_stop_gen = -1  # Iteration of the cached stopping criteria
+    es._last_stop = {}
+    # Population size and dimension as plain ints (fixed for the run)
+    es._popsize = int(es.popsize)
+    es._dim = int(es.N)
+    es._shape = (es._popsize, es._dim)
+    es._pop_buf = np.empty(es._shape, dtype=np.float64)  # Refilled in place by every ask
+
+    return es
+
+
+def _bind_buffers(es):
+    """
+    Make es's population buffer and a fitness buffer of its population size
+    the module buffers: JavaScript reads them through a typed-array view on
+    the WASM heap instead of JSON
+    """
+    global _solutions_buf, _fitness_buf
+
+    _solutions_buf = es._pop_buf
+    _fitness_buf = np.empty(es._popsize, dtype=np.float64)
+
+
+def _resolve_defaults(dim, backend, separable, update_interval):
+    """
+    Resolve the dimension-dependent defaults of backend, separable and
+    update_interval
+
+    Returns:
+        Tuple (backend, separable, update_interval)
+    """
+    if backend is None:
+        backend = 'vkd' if dim > LIMITED_MEMORY_MIN_DIM and not separable else 'pycma'
+    if backend == 'vkd':
+        # VkD has its own restricted covariance: no diagonal-only variant
+        if separable:
+            raise ValueError("backend='vkd' cannot be separable")
+        separable = False
+    elif separable is None:
+        separable = dim > SEPARABLE_MIN_DIM
+    if update_interval is None:
+        update_interval = max(1, dim // 10)
+    return backend, separable, update_interval
+
+
+def initialize_optimizer(initial_guess, bounds_min, bounds_max, sigma=0.5, maxiter=100, popsize=10, tolfun=1e-6, has_constraints=True, backend=None, separable=None, blas_threads=None, verbose=False, restart_strategy=None, max_restarts=9, warm_start_state=None, update_interval=None):
     """
     Initialize CMA-ES optimizer with or without ConstrainedFitnessAL
 
@@ -24,24 +256,73 @@ def initialize_optimizer(initial_guess, bounds_min, bounds_max, sigma=0.5, maxit
         popsize: Population size
         tolfun: Tolerance on objective function
         has_constraints: Whether to use ConstrainedFitnessAL (default True)
+        backend: 'pycma' (cma.CMAEvolutionStrategy), 'cmaes' (cmaes.CMA,
+            lower per-generation overhead, requires cmaes) or 'vkd'
+            (limited-memory VkD-CMA-ES: C = D(I + V^T V)D with k <= m vectors,
+            O(m*d) memory and sampling). None (default) selects 'vkd' when the
+            dimension exceeds LIMITED_MEMORY_MIN_DIM (unless separable is
+            True), 'pycma' otherwise
+        separable: Use a diagonal covariance matrix (sep-CMA-ES: O(d) memory
+            and update instead of O(d^2) / O(d^3)); not available with 'vkd'.
+            None (default) enables it when the dimension exceeds
+            SEPARABLE_MIN_DIM and the backend is not 'vkd', i.e. between
+            SEPARABLE_MIN_DIM and LIMITED_MEMORY_MIN_DIM by default
+        blas_threads: Number of BLAS threads for the covariance
+            eigendecomposition (requires threadpoolctl, ignored otherwise).
+            Keep it at 1 when the caller already evaluates solutions in
+            parallel, to avoid oversubscribing the cores. None leaves the
+            BLAS default untouched
+        verbose: Print pycma's status line every iteration (debugging only)
+        restart_strategy: None, 'ipop' (restart with a doubled population) or
+            'bipop' (alternate large-population and small-population local
+            restarts, as cma.fmin(bipop=True)). Restarts are performed by
+            check_convergence, which rebinds the global `es`
+        max_restarts: Maximum number of large-population restarts
+        warm_start_state: State returned by get_state() for a previous run
+            (dict or JSON string). Its mean, step size and covariance (full
+            matrix, sep-CMA diagonal or VkD factors) seed the new strategy,
+            so re-solving a slightly changed problem reuses the learned
+            geometry. Ignored if the dimension differs
+        update_interval: Iterations between two eigendecompositions of the
+            full covariance matrix (pycma backend). Default max(1, d // 10),
+            so small problems are unaffected. Larger values only pay off when
+            the objective is cheap and the O(d^3) update dominates
 
     Returns:
         Tuple (CMA-ES optimizer, ConstrainedFitnessAL or None)
     """
     global cfun
 
-    bounds = [bounds_min, bounds_max]
+    # Contiguous float64 copies, converted once and reused by the backends
+    x0 = np.ascontiguousarray(initial_guess, dtype=np.float64)
+    lb = np.ascontiguousarray(bounds_min, dtype=np.float64)
+    ub = np.ascontiguousarray(bounds_max, dtype=np.float64)
+    dim = x0.size
 
-    opts = {
-        'bounds': bounds,
-        'verb_disp': 1,
-        'verb_log': 0,
-        'maxiter': maxiter,
-        'popsize': popsize,
-        'tolfun': tolfun
-    }
+    # Limits apply process-wide, before the first ask()/tell()
+    if blas_threads is not None and threadpool_limits is not None:
+        threadpool_limits(limits=blas_threads, user_api='blas')
+
+    backend, separable, update_interval = _resolve_defaults(dim, backend, separable, update_interval)
 
-    es = cma.CMAEvolutionStrategy(initial_guess, sigma, opts)
+    es = _create_strategy(x0, lb, ub, sigma, maxiter, popsize, tolfun, backend, separable, verbose, update_interval)
+    _bind_buffers(es)
+    if warm_start_state is not None:
+        _set_state(es, warm_start_state)
+
+    # Restart regime state, carried over to each restarted strategy
+    if restart_strategy not in (None, 'ipop', 'bipop'):
+        raise ValueError(f"Unknown restart strategy: {restart_strategy} (expected 'ipop' or 'bipop')")
+    es._restart = None if restart_strategy is None else {
+        'strategy': restart_strategy,
+        'max_restarts': max_restarts,
+        'settings': (sigma, maxiter, popsize, tolfun, backend, separable, verbose, update_interval),
+        'irun': 0,
+        'runs_with_small': 0,
+        'poptype': 'small',  # First run counts as a small-population run
+        'small_evals': [],
+        'large_evals': []
+    }
 
     # If no constraints, return None as cfun
     if not has_constraints:
@@ -78,32 +359,445 @@ def ask_solutions(es):
         es: CMA-ES optimizer
 
     Returns:
-        List of solutions (JSON)
+        Solutions buffer (popsize x ndim float64 array, read from JavaScript
+        with getBuffer('f64'); overwritten by the next call)
     """
-    solutions = es.ask()
-    return json.dumps([list(sol) for sol in solutions])
+    np.copyto(es._pop_buf, es.ask())
+    es._pending = es._pop_buf
+    return es._pop_buf
 
 
-def tell_results(es, solutions, fitnesses, cfun):
+def tell_results(es, cfun):
     """
     Return evaluation results to optimizer and update AL coefficients
 
+    The population is the one cached by ask_solutions (never sent back by
+    the caller) and its fitnesses are read from the buffer filled by
+    evaluate_batch.
+
     Args:
         es: CMA-ES optimizer
-        solutions: Evaluated solutions
-        fitnesses: Corresponding fitness values
         cfun: ConstrainedFitnessAL instance or None
 
     Returns:
         "ok"
     """
-    es.tell(solutions, fitnesses)
+    if es._pending is None:
+        raise RuntimeError("tell_results called without a pending population (call ask_solutions first)")
+    es.tell(es._pending, _fitness_buf)
+    es._pending = None
     # Only update AL coefficients if we have constraints
     if cfun is not None:
         cfun.update(es)
     return "ok"
 
 
+def ask_solutions_binary(es, dtype='float64'):
+    """
+    Request a new population as a binary payload (for bridges without
+    shared memory)
+
+    Args:
+        es: CMA-ES optimizer
+        dtype: 'float64' or 'float32' (half the payload, for evaluators
+            that compute in single precision, e.g. on the GPU)
+
+    Returns:
+        JSON with {shape: [popsize, ndim], dtype, data: base64 of the
+        row-major population}
+    """
+    _binary_dtype(dtype)  # Fail before asking
+    solutions = ask_solutions(es)
+    return _dumps({
+        'shape': list(solutions.shape),
+        'dtype': dtype,
+        'data': _encode_array(solutions, dtype)
+    })
+
+
+def tell_results_binary(es, solutions_b64, fitness_b64, cfun=None, dtype='float64'):
+    """
+    Return a binary-encoded evaluated population to the optimizer
+
+    Fitnesses are upcast to float64 for the CMA update. A float32
+    population is only a rounded copy of the pending one, which is told
+    instead (solutions_b64 may then be None).
+
+    Args:
+        es: CMA-ES optimizer
+        solutions_b64: base64 of the row-major population (as returned by
+            ask_solutions_binary)
+        fitness_b64: base64 of the fitness vector (from evaluate_batch)
+        cfun: ConstrainedFitnessAL instance or None
+        dtype: 'float64' or 'float32', dtype of both payloads
+
+    Returns:
+        "ok"
+    """
+    if dtype == 'float64' and solutions_b64 is not None:
+        np.copyto(es._pop_buf, _decode_array(solutions_b64).reshape(es._pop_buf.shape))
+        es._pending = es._pop_buf
+    _fitness_buf[:] = _decode_array(fitness_b64, dtype)
+    return tell_results(es, cfun)
+
+
+def _open_shared_memory(name):
+    """Open the existing shared memory block `name` without tracking it"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix':
+        # Opening registers the block too: the resource tracker would
+        # unlink the caller's block when this process exits
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _attach_shared_memory(name, size):
+    """
+    Attach to the shared memory block `name`, creating it if needed
+
+    Returns:
+        Tuple (SharedMemory, created)
+    """
+    try:
+        shm = _open_shared_memory(name)
+    except FileNotFoundError:
+        return shared_memory.SharedMemory(name=name, create=True, size=size), True
+    if shm.size < size:
+        shm.close()
+        raise ValueError(f"Shared memory block {name} is smaller than {size} bytes")
+    return shm, False
+
+
+def initialize_shared(es, shm_name, popsize=None, d=None):
+    """
+    Back the population/fitness buffers with shared memory blocks, for an
+    out-of-process caller (e.g. a stdio bridge) that maps the same blocks
+
+    Blocks are '<shm_name>_solutions' (popsize x d float64, row-major) and
+    '<shm_name>_fitness' (popsize float64); missing blocks are created, and
+    unlinked by release_shared. After an IPOP/BIPOP restart the blocks are
+    attached again at the new population size: the caller remaps them
+    (blocks it created must be large enough for the new population).
+
+    Args:
+        es: CMA-ES optimizer
+        shm_name: Base name of the shared memory blocks (None disables)
+        popsize: Population size (default: the optimizer's)
+        d: Dimension (default: the optimizer's)
+
+    Returns:
+        JSON with {shared, solutions, fitness, shape}; shared is false when
+        shared memory is unavailable, ask_solutions_shared then returns JSON
+    """
+    global _solutions_buf, _fitness_buf
+
+    release_shared(es)
+    es._shm = es._shm_name = None
+    es._shared_generation = 0
+    if shm_name is None or shared_memory is None:
+        return _dumps({'shared': False})
+
+    shape = (popsize or es._popsize, d or es._dim)
+    if shape != es._shape:
+        raise ValueError(f"Shared buffer shape {shape} does not match the population {es._shape}")
+    itemsize = np.dtype(np.float64).itemsize
+    solutions_shm, solutions_created = _attach_shared_memory(f'{shm_name}_solutions', shape[0] * shape[1] * itemsize)
+    try:
+        fitness_shm, fitness_created = _attach_shared_memory(f'{shm_name}_fitness', shape[0] * itemsize)
+    except ValueError:
+        solutions_shm.close()
+        if solutions_created:
+            solutions_shm.unlink()
+        raise
+
+    # ask_solutions/evaluate_batch/tell_results now work in shared memory
+    _solutions_buf = np.ndarray(shape, dtype=np.float64, buffer=solutions_shm.buf)
+    _fitness_buf = np.ndarray(shape[0], dtype=np.float64, buffer=fitness_shm.buf)
+    es._pop_buf = _solutions_buf
+    es._shm = (solutions_shm, fitness_shm)  # Keep the mappings alive
+    es._shm_created = (solutions_created, fitness_created)
+    es._shm_name = shm_name
+    return _dumps({
+        'shared': True,
+        'solutions': solutions_shm.name,
+        'fitness': fitness_shm.name,
+        'shape': list(shape)
+    })
+
+
+def release_shared(es):
+    """
+    Detach es from its shared memory blocks: close the mappings and unlink
+    the blocks initialize_shared created (caller-created blocks are left to
+    the caller). The buffers go back to private memory, keeping their content
+
+    Args:
+        es: CMA-ES optimizer
+
+    Returns:
+        "ok"
+    """
+    global _solutions_buf, _fitness_buf
+
+    if getattr(es, '_shm', None) is None:
+        return "ok"
+
+    # Drop every view into the blocks (close() fails while one is exported)
+    pending = es._pending is not None
+    if _solutions_buf is es._pop_buf:
+        _solutions_buf = np.array(_solutions_buf)
+        _fitness_buf = np.array(_fitness_buf)
+        es._pop_buf = _solutions_buf
+    else:
+        es._pop_buf = np.array(es._pop_buf)
+    if pending:
+        es._pending = es._pop_buf
+
+    for block, created in zip(es._shm, es._shm_created):
+        block.close()
+        if created:
+            block.unlink()
+    es._shm = None
+    return "ok"
+
+
+def ask_solutions_shared(es):
+    """
+    Write a new population into the shared solutions block
+
+    Args:
+        es: CMA-ES optimizer
+
+    Returns:
+        Generation counter (int) once the block is written, or the
+        population as JSON when shared memory is not configured
+    """
+    solutions = ask_solutions(es)
+    if getattr(es, '_shm', None) is None:
+        return _dumps(solutions.tolist())
+    es._shared_generation += 1
+    return es._shared_generation
+
+
+def tell_results_shared(es, cfun=None):
+    """
+    Tell the pending population with the fitnesses read from the shared
+    fitness block (or from evaluate_batch when shared memory is not
+    configured)
+
+    Args:
+        es: CMA-ES optimizer
+        cfun: ConstrainedFitnessAL instance or None
+
+    Returns:
+        "ok"
+    """
+    return tell_results(es, cfun)
+
+
+def initialize_optimizer_pool(n_instances, initial_guess, bounds_min, bounds_max, sigma=0.5, maxiter=100, popsize=10, tolfun=1e-6, backend=None, separable=None, update_interval=None):
+    """
+    Initialize several independent CMA-ES instances driven together
+    (multi-start exploration of multimodal problems)
+
+    Instances are unconstrained: the caller folds constraint violations
+    into the fitness it passes to tell_results_pool. The pool owns its
+    buffers, so an optimizer created by initialize_optimizer (and its
+    cfun) is not affected.
+
+    Args:
+        n_instances: Number of CMA-ES instances
+        initial_guess: One start point per instance (n_instances x ndim), or
+            a single point: the first instance starts there and the others
+            uniformly at random within the (finite) bounds
+        bounds_min, bounds_max, sigma, maxiter, popsize, tolfun, backend,
+            separable, update_interval: As for initialize_optimizer
+
+    Returns:
+        List of CMA-ES optimizers
+    """
+    lb = np.ascontiguousarray(bounds_min, dtype=np.float64)
+    ub = np.ascontiguousarray(bounds_max, dtype=np.float64)
+    starts = np.array(initial_guess, dtype=np.float64, ndmin=2)
+    if starts.shape[0] == 1:
+        finite = np.isfinite(lb) & np.isfinite(ub)
+        starts = np.repeat(starts, n_instances, axis=0)
+        starts[1:, finite] = np.random.uniform(lb[finite], ub[finite], (n_instances - 1, finite.sum()))
+    if starts.shape[0] != n_instances:
+        raise ValueError(f"Got {starts.shape[0]} start points for {n_instances} instances")
+
+    backend, separable, update_interval = _resolve_defaults(starts.shape[1], backend, separable, update_interval)
+    return [_create_strategy(x0, lb, ub, sigma, maxiter, popsize, tolfun, backend, separable, False, update_interval)
+            for x0 in starts]
+
+
+def ask_solutions_pool(pool):
+    """
+    Request a new population from every instance of the pool
+
+    Args:
+        pool: List of CMA-ES optimizers (from initialize_optimizer_pool)
+
+    Returns:
+        JSON with {solutions: concatenated populations (sum of popsizes x
+        ndim), index: instance index of each solution}
+    """
+    # Each instance asks into its own preallocated population buffer
+    populations = [ask_solutions(es) for es in pool]
+    return _dumps({
+        'solutions': np.concatenate(populations).tolist(),
+        'index': np.repeat(np.arange(len(pool)), [es._popsize for es in pool]).tolist()
+    })
+
+
+def _tell_pending(es, fitnesses):
+    """Tell es its pending population"""
+    es.tell(es._pending, fitnesses)
+    es._pending = None
+
+
+def _get_pool_executor():
+    """
+    Worker threads for tell_results_pool, probed once: None where threads
+    cannot be started (Pyodide)
+    """
+    global _pool_executor
+
+    if _pool_executor is None:
+        executor = ThreadPoolExecutor()
+        try:
+            executor.submit(int).result()  # Starts the first worker thread
+        except RuntimeError:
+            executor.shutdown(wait=False)
+            executor = False
+        _pool_executor = executor
+    return _pool_executor or None
+
+
+def tell_results_pool(pool, fitnesses):
+    """
+    Return the fitnesses of the concatenated populations to the instances
+
+    Each instance's update runs on a worker thread (NumPy's
+    eigendecomposition releases the GIL), or sequentially where threads
+    are unavailable (Pyodide).
+
+    Args:
+        pool: List of CMA-ES optimizers
+        fitnesses: Fitness values, in ask_solutions_pool order
+
+    Returns:
+        "ok"
+    """
+    if any(es._pending is None for es in pool):
+        raise RuntimeError("tell_results_pool called without pending populations (call ask_solutions_pool first)")
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    splits = np.split(fitnesses, np.cumsum([es._popsize for es in pool])[:-1])
+
+    executor = _get_pool_executor() if len(pool) > 1 else None
+    if executor is None:
+        for es, es_fitnesses in zip(pool, splits):
+            _tell_pending(es, es_fitnesses)
+    else:
+        list(executor.map(_tell_pending, pool, splits))
+    return "ok"
+
+
+def _covariance(es):
+    """Covariance of the strategy (matrix or diagonal), None if not stored"""
+    if isinstance(es, CMAesStrategy):
+        return es.C
+    return getattr(es.sm, 'C', None)  # Only pycma's full sampler stores C
+
+
+def _sampler_state(es):
+    """
+    Learned state of a VkD sampler (step size and C = D(I + V^T S V)D
+    factors), None for other samplers
+    """
+    sm = getattr(es, 'sm', None)
+    if not isinstance(sm, GaussVkDSampler):
+        return None
+    return {
+        'sigma': float(sm.sigma),
+        'D': _encode_array(sm.D),
+        'V': _encode_array(sm.V),
+        'S': _encode_array(sm.S),
+        'k': int(sm.k),
+        'k_active': int(sm.k_active)
+    }
+
+
+def get_state(es):
+    """
+    Serialize the search distribution for a later warm start
+
+    Args:
+        es: CMA-ES optimizer
+
+    Returns:
+        JSON with {dim, mean, sigma, C, sigma_vec, sampler}: arrays as base64
+        float64. C is row-major, or null when the backend keeps no explicit
+        covariance; sigma_vec is pycma's diagonal scaling (where sep-CMA
+        learns its covariance), null for the cmaes backend; sampler holds
+        the VkD step size and factors, null for other samplers
+    """
+    C = _covariance(es)
+    sigma_vec = getattr(es, 'sigma_vec', None)
+    return _dumps({
+        'dim': es._dim,
+        'mean': _encode_array(es.mean),
+        'sigma': float(es.sigma),
+        'C': None if C is None else _encode_array(C),
+        'sigma_vec': None if sigma_vec is None else _encode_array(np.ones(es._dim) * sigma_vec.scaling),
+        'sampler': _sampler_state(es)
+    })
+
+
+def _set_state(es, state):
+    """
+    Seed the search distribution of es from a get_state() result
+
+    Args:
+        es: CMA-ES optimizer
+        state: dict or JSON string returned by get_state()
+    """
+    if isinstance(state, str):
+        state = json.loads(state)
+    if state['dim'] != es._dim:
+        return
+
+    mean = _decode_array(state['mean'])
+    C = None
+    current = _covariance(es)
+    if state['C'] is not None and current is not None:
+        C = _decode_array(state['C'])
+        C = C.reshape(current.shape) if C.size == np.size(current) else None
+
+    if isinstance(es, CMAesStrategy):
+        es.set_state(mean, state['sigma'], C)
+        return
+    es.mean = mean.copy()
+    es.sigma = float(state['sigma'])
+    if C is not None:
+        es.sm.C = C.copy()
+        es.sm.update_now(-1)  # Eigendecomposition of the new C
+    if state.get('sigma_vec') is not None:
+        es.sigma_vec = DiagonalDecoding(_decode_array(state['sigma_vec']))
+
+    # VkD: the step size is adapted by the sampler (pycma's sigma is fixed)
+    sampler = state.get('sampler')
+    if sampler is not None and isinstance(es.sm, GaussVkDSampler) and sampler['k'] <= es.sm.kmax:
+        es.sm.sigma = sampler['sigma']
+        es.sm.D = _decode_array(sampler['D']).copy()
+        es.sm.V = _decode_array(sampler['V']).reshape(sampler['k'], es._dim).copy()
+        es.sm.S = _decode_array(sampler['S']).copy()
+        es.sm.k = sampler['k']
+        es.sm.k_active = sampler['k_active']
+
+
 def get_best_feasible(cfun):
     """
     Retrieve the best feasible solution found
@@ -116,13 +810,13 @@ def get_best_feasible(cfun):
     """
     # If no constraints, there's no best_feas to return
     if cfun is None:
-        return json.dumps(None)
+        return _dumps(None)
 
     if cfun.best_feas is None or cfun.best_feas.x is None:
-        return json.dumps(None)
+        return _dumps(None)
 
-    return json.dumps({
-        'solution': list(cfun.best_feas.x),
+    return _dumps({
+        'solution': np.asarray(cfun.best_feas.x).tolist(),
         'objective': float(cfun.best_feas.f),
         'feasible': True
     })
@@ -142,8 +836,15 @@ def is_feasible(cfun):
         return False
 
     # A solution is feasible if all constraints are <= 0
-    last_constraints = cfun.G[-1]
-    return all(g <= 0 for g in last_constraints)
+    g = np.asarray(cfun.G[-1], dtype=np.float64)
+    return bool((g <= 0.0).all())
+
+
+def _stop_value(value):
+    """JSON-typed value of a stopping criterion"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return value if isinstance(value, (int, float, str, bool)) else str(value)
 
 
 def check_convergence(es):
@@ -154,9 +855,71 @@ def check_convergence(es):
         es: CMA-ES optimizer
 
     Returns:
-        Dictionary of stopping criteria (empty if not converged)
+        JSON dictionary of stopping criteria (empty if not converged), or
+        "restarted" when an IPOP/BIPOP restart replaced the global `es`.
+        Values keep their JSON type (e.g. {"tolfun": 1e-06}); other values
+        are stringified
+    """
+    # Criteria only change when the optimizer iterates
+    if es.countiter != es._last_stop_gen:
+        es._last_stop = {k: _stop_value(v) for k, v in es.stop().items()}
+        es._last_stop_gen = es.countiter
+
+    # Restart instead of stopping while the IPOP/BIPOP budget allows it
+    if es._last_stop and es._restart is not None and _restart(es) is not None:
+        return "restarted"
+    return _dumps(es._last_stop)
+
+
+def _restart(previous):
+    """
+    Start the next IPOP/BIPOP run once `previous` has stopped
+    (regime logic of cma.fmin with restarts and bipop=True)
+
+    Args:
+        previous: Stopped CMA-ES optimizer
+
+    Returns:
+        New CMA-ES optimizer (also bound to the global `es`), or None once
+        the restart budget is spent
     """
-    return str(es.stop())
+    global es
+
+    state = previous._restart
+    shm_name = getattr(previous, '_shm_name', None)
+    sigma0, maxiter0, popsize0, tolfun, backend, separable, verbose, update_interval = state['settings']
+
+    # Account the evaluations of the finished run to its regime
+    evals = previous.countiter * previous._popsize
+    state['small_evals' if state['poptype'] == 'small' else 'large_evals'].append(evals)
+    state['irun'] += 1
+
+    if state['irun'] - state['runs_with_small'] > state['max_restarts']:
+        return None
+
+    sigma, maxiter = sigma0, maxiter0
+    if state['strategy'] == 'bipop' and sum(state['small_evals']) < max(1, sum(state['large_evals'])):
+        # Interleaved local search: smaller population and step size,
+        # budget limited to half of what the large runs used
+        state['poptype'] = 'small'
+        state['runs_with_small'] += 1
+        multiplier = 2 ** (state['irun'] - state['runs_with_small'])
+        popsize = int(popsize0 * multiplier ** (np.random.uniform() ** 2))
+        sigma = sigma0 * 0.01 ** np.random.uniform()
+        maxiter = max(1, int(min(maxiter0, 0.5 * sum(state['large_evals']) / popsize)))
+    else:
+        # Large population run: population doubled at each such restart
+        state['poptype'] = 'large'
+        popsize = popsize0 * 2 ** (state['irun'] - state['runs_with_small'])
+
+    es = _create_strategy(previous._x0, previous._lb, previous._ub, sigma, maxiter, popsize, tolfun, backend, separable, verbose, update_interval)
+    _bind_buffers(es)
+    es._restart = state
+    if shm_name is not None:
+        # The population size changed: attach the blocks again at the new size
+        release_shared(previous)
+        initialize_shared(es, shm_name)
+    return es
 
 
 def get_cmaes_metrics(cfun, last_solution):
@@ -171,7 +934,7 @@ def get_cmaes_metrics(cfun, last_solution):
         JSON with exact CMA-ES metrics
     """
     if not hasattr(cfun, 'G') or len(cfun.G) == 0:
-        return json.dumps(None)
+        return _dumps(None)
 
     # Last evaluated constraints (raw g(x) values)
     last_constraints = cfun.G[-1]
@@ -183,20 +946,21 @@ def get_cmaes_metrics(cfun, last_solution):
     al_penalty = true_al_fitness - _current_objective
 
     # EXACT: Violations (max(0, g))
-    violations = [max(0, g) for g in last_constraints]
-    hard_violation = max(violations) if violations else 0
-    mean_violation = sum(violations) / len(violations) if violations else 0
+    g = np.asarray(last_constraints, dtype=np.float64)
+    violations = np.maximum(g, 0.0)
+    hard_violation = float(violations.max()) if violations.size else 0
+    mean_violation = float(violations.mean()) if violations.size else 0
 
     # EXACT: Feasibility
-    is_feas = all(g <= 0 for g in last_constraints)
+    is_feas = bool((g <= 0.0).all())
 
     # EXACT: Lagrange multipliers
-    lambda_vals = list(cfun.lambda_) if hasattr(cfun, 'lambda_') else []
+    lambda_vals = np.asarray(cfun.lambda_, dtype=np.float64).tolist() if hasattr(cfun, 'lambda_') else []
 
     # EXACT: Penalty factor
     mu_val = float(cfun.mu) if hasattr(cfun, 'mu') else 1.0
 
-    return json.dumps({
+    return _dumps({
         'lambda': lambda_vals,
         'mu': mu_val,
         'alFitness': float(true_al_fitness),
@@ -204,7 +968,7 @@ def get_cmaes_metrics(cfun, last_solution):
         'hardViolation': float(hard_violation),
         'meanViolation': float(mean_violation),
         'isFeasible': is_feas,
-        'constraints': list(last_constraints)
+        'constraints': g.tolist()
     })
 
 
@@ -214,7 +978,8 @@ def evaluate_batch(evaluations):
 
     Args:
         evaluations: List of {
-            'solution': [x1, x2, ...],
+            'solution': [x1, x2, ...],  # Optional: defaults to the row of
+                                        # the last ask (solutions buffer)
             'objective': float,
             'alConstraints': [g1, g2, ...]
         }
@@ -228,37 +993,63 @@ def evaluate_batch(evaluations):
     """
     global _current_objective, _current_constraints, cfun
 
-    fitnesses = []
-    feasibilities = []
-    last_solution = None
-
-    for eval_data in evaluations:
-        solution = eval_data['solution']
-
-        # Update global variables
-        _current_objective = eval_data['objective']
-        _current_constraints = eval_data['alConstraints']
-
-        # If no constraints (cfun is None), use objective directly
-        if cfun is None:
-            fitness = _current_objective
-            feasible = True  # Always feasible if no constraints
-        else:
-            # Evaluate with ConstrainedFitnessAL
-            fitness = cfun(solution)
-            feasible = is_feasible(cfun)
-
-        fitnesses.append(float(fitness))
-        feasibilities.append(feasible)
-        last_solution = solution
-
-    # Get EXACT metrics from last eval (only if constraints exist)
-    cmaes_metrics = None
-    if last_solution is not None and cfun is not None:
-        metrics_json = get_cmaes_metrics(cfun, last_solution)
-        cmaes_metrics = json.loads(metrics_json) if metrics_json else None
-
-    return json.dumps({
+    if len(evaluations) == 0:
+        return _dumps({'fitnesses': [], 'feasibilities': [], 'cmaesMetrics': None})
+
+    # Convert the batch (list of dicts) to SoA arrays once. Solutions are
+    # not sent back by JavaScript: they are the rows the ask wrote in the
+    # buffer (copied, since cfun keeps a reference to its best solution)
+    if 'solution' in evaluations[0]:
+        solutions = np.asarray([e['solution'] for e in evaluations], dtype=np.float64)
+    else:
+        solutions = _solutions_buf[:len(evaluations)].copy()
+    objectives = np.asarray([e['objective'] for e in evaluations], dtype=np.float64)
+    constraints = np.asarray([e['alConstraints'] for e in evaluations], dtype=np.float64)
+
+    # If no constraints (cfun is None), fitness is the objective itself
+    if cfun is None:
+        _current_objective = float(objectives[-1])
+        _current_constraints = constraints[-1].tolist()
+        _fitness_buf[:len(objectives)] = objectives
+        return _dumps({
+            'fitnesses': objectives.tolist(),
+            'feasibilities': [True] * len(objectives),  # Always feasible if no constraints
+            'cmaesMetrics': None
+        })
+
+    # A solution is feasible if all its constraints are <= 0 (whole batch at once)
+    feasible = (constraints <= 0).all(axis=1)
+
+    # cfun skips the objective while searching for a first feasible solution:
+    # objectives are consumed from the first feasible one in that case
+    first_objective = 0
+    if cfun.finding_feasible:
+        feasible_indices = np.flatnonzero(feasible)
+        first_objective = feasible_indices[0] if feasible_indices.size else len(feasible)
+
+    # Evaluate with ConstrainedFitnessAL: one call per solution is required
+    # since cfun records F/G history, best feasible solution and AL state.
+    # Stored values are fed through C-level iterators instead of the Python
+    # wrappers (next(values, x) ignores x like the wrappers do)
+    objective_wrapper, constraints_wrapper = cfun.fun, cfun.constraints
+    cfun.fun = functools.partial(next, iter(objectives[first_objective:].tolist()))
+    cfun.constraints = functools.partial(next, iter(constraints.tolist()))
+    try:
+        fitnesses = [float(cfun(solution)) for solution in solutions]
+    finally:
+        cfun.fun, cfun.constraints = objective_wrapper, constraints_wrapper
+
+    # Update global variables (read by the wrappers for the metrics evaluation)
+    _current_objective = float(objectives[-1])
+    _current_constraints = constraints[-1].tolist()
+    _fitness_buf[:len(fitnesses)] = fitnesses
+    feasibilities = feasible.tolist()
+
+    # Get EXACT metrics from last eval
+    metrics_json = get_cmaes_metrics(cfun, solutions[-1])
+    cmaes_metrics = json.loads(metrics_json) if metrics_json else None
+
+    return _dumps({
         'fitnesses': fitnesses,
         'feasibilities': feasibilities,
         'cmaesMetrics': cmaes_metrics
@@ -33,6 +33,11 @@ import { ProgressTracker } from './ProgressTracker.js';
  * @property {number} [solverParams.popsize=10] - Population size
  * @property {number} [solverParams.sigma=0.5] - Initial step size
  * @property {number} [solverParams.tolfun=1e-6] - Tolerance for function value
+ * @property {string} [solverParams.backend] - CMA-ES implementation: 'pycma', 'cmaes' (requires 'cmaes' in pyodideOptions.micropipPackages) or 'vkd' (limited memory, default above 80 variables)
+ * @property {boolean} [solverParams.separable] - Diagonal covariance (sep-CMA-ES), enabled by default from 41 to 80 variables (above, the default 'vkd' backend is used instead; not available with 'vkd')
+ * @property {string} [solverParams.restartStrategy] - Restart strategy: 'ipop' or 'bipop' (restarts share the maxiter generation budget)
+ * @property {boolean} [solverParams.warmStart=false] - Seed CMA-ES with the distribution learned by the previous warmStart run (same variables in the same order, same bounds)
+ * @property {boolean} [solverParams.verbose=false] - Print pycma's per-iteration status line to the console
  * @property {number} [solverParams.progressStep=1] - Progress notification step in percent (1 = notify every 1%)
  */
 
@@ -107,6 +112,7 @@ export class GeoGebraOptimizer extends EventBus {
         this.geogebraManager = null;
         this.optimizationRunning = false;
         this.stopRequested = false;
+        this.optimizerState = null; // {variables, min, max, state}: search distribution of the last run (for warm starts)
 
         this.state = {
             isReady: false,
@@ -311,6 +317,8 @@ export class GeoGebraOptimizer extends EventBus {
 
             // Initialize CMA-ES optimizer with or without ConstrainedFitnessAL
             const hasConstraints = constraints.length > 0 ? 'True' : 'False';
+            const separable = solverParams.separable === undefined ? 'None' : (solverParams.separable ? 'True' : 'False');
+            const warmStartState = solverParams.warmStart ? this.getWarmStartState(selectedVariables, bounds) : null;
             
             const initCode = `
             es, cfun = initialize_optimizer(
@@ -321,7 +329,12 @@ export class GeoGebraOptimizer extends EventBus {
                 maxiter=${solverParams.maxiter},
                 popsize=${solverParams.popsize},
                 tolfun=${solverParams.tolfun},
-                has_constraints=${hasConstraints}
+                has_constraints=${hasConstraints},
+                backend=${solverParams.backend ? JSON.stringify(solverParams.backend) : 'None'},
+                separable=${separable},
+                verbose=${solverParams.verbose ? 'True' : 'False'},
+                restart_strategy=${solverParams.restartStrategy ? JSON.stringify(solverParams.restartStrategy) : 'None'},
+                warm_start_state=${warmStartState ? JSON.stringify(warmStartState) : 'None'}
             )
             "initialized"
             `;
@@ -353,6 +366,7 @@ export class GeoGebraOptimizer extends EventBus {
 
             let generation = 0;
             let totalEvaluations = 0;
+            let popsize = solverParams.popsize;
             let bestFitness = Infinity;
             let bestSolution = null;
             let bestObjective = Infinity;
@@ -364,9 +378,16 @@ export class GeoGebraOptimizer extends EventBus {
 
             // Optimization loop
             while (!this.stopRequested && generation < solverParams.maxiter) {
-                // Ask for a new population
-                const solutionsJson = await this.pyodideManager.runPython(`ask_solutions(es)`);
-                const solutions = JSON.parse(solutionsJson);
+                // Ask for a new population (shared float64 buffer, no JSON)
+                const solutionsProxy = await this.pyodideManager.runPython(`ask_solutions(es)`);
+                const solutions = this.readSolutionsBuffer(solutionsProxy);
+
+                // IPOP/BIPOP restarts change the population size: resize the
+                // progress to the remaining generations at the new size
+                if (solutions.length !== popsize) {
+                    popsize = solutions.length;
+                    this.progressTracker.resize(totalEvaluations + (solverParams.maxiter - generation) * popsize);
+                }
 
                 // Prepare batch evaluation data
                 const evaluations = [];
@@ -384,8 +405,8 @@ export class GeoGebraOptimizer extends EventBus {
                         defaultTolerance
                     );
 
+                    // The solution itself stays in the Python solutions buffer
                     evaluations.push({
-                        solution: solution,
                         objective: result.objective,
                         alConstraints: result.alConstraints,
                         movementPenalty: result.movementPenalty,
@@ -470,9 +491,8 @@ export class GeoGebraOptimizer extends EventBus {
                 if (this.stopRequested) break;
 
                 // Return results to CMA-ES and update AL coefficients
-                await this.pyodideManager.runPython(
-                    `tell_results(es, ${JSON.stringify(solutions)}, ${JSON.stringify(fitnesses)}, cfun)`
-                );
+                // (population and fitnesses are already in the Python buffers)
+                await this.pyodideManager.runPython(`tell_results(es, cfun)`);
 
                 generation++;
 
@@ -501,7 +521,13 @@ export class GeoGebraOptimizer extends EventBus {
 
                 // Vérifier la convergence
                 const stopDict = await this.pyodideManager.runPython(`check_convergence(es)`);
-                if (stopDict !== '{}') {
+                if (stopDict === 'restarted') {
+                    this.emit('log', {
+                        message: `CMA-ES restarted (${solverParams.restartStrategy}) at generation ${generation}`,
+                        level: 'info',
+                        timestamp: new Date()
+                    });
+                } else if (stopDict !== '{}') {
                     this.emit('log', {
                         message: 'Convergence atteinte: ' + stopDict,
                         level: 'info',
@@ -511,6 +537,16 @@ export class GeoGebraOptimizer extends EventBus {
                 }
             }
 
+            // Keep the learned distribution for a later warm start on the same variables
+            if (solverParams.warmStart) {
+                this.optimizerState = {
+                    variables: [...selectedVariables],
+                    min: [...bounds.min],
+                    max: [...bounds.max],
+                    state: await this.pyodideManager.runPython(`get_state(es)`)
+                };
+            }
+
             // Get best feasible solution from CMA-ES
             const bestFeasibleJson = await this.pyodideManager.runPython(`get_best_feasible(cfun)`);
             const bestFeasibleFromCMAES = JSON.parse(bestFeasibleJson);
@@ -591,6 +627,53 @@ export class GeoGebraOptimizer extends EventBus {
         this.geogebraManager.setVariableValues(updates);
     }
 
+    /**
+     * Warm-start state of the previous run, if it optimized exactly the same
+     * variables (same names, same order) with the same bounds
+     *
+     * @param {string[]} selectedVariables - Names of the variables to optimize
+     * @param {{min: number[], max: number[]}} bounds - Bounds of these variables
+     * @returns {string|null} get_state() JSON, or null if there is none to reuse
+     */
+    getWarmStartState(selectedVariables, bounds) {
+        const previous = this.optimizerState;
+        const same = (a, b) => a.length === b.length && a.every((value, i) => value === b[i]);
+        if (!previous || !same(previous.variables, selectedVariables)
+            || !same(previous.min, bounds.min) || !same(previous.max, bounds.max)) {
+            return null;
+        }
+        return previous.state;
+    }
+
+    /**
+     * Copy the population out of the Python solutions buffer
+     *
+     * The buffer is a view on the WASM heap that the next ask_solutions call
+     * overwrites, so rows are copied into plain JS arrays and the view released.
+     *
+     * @param {PyProxy} solutionsProxy - Proxy of the (popsize, ndim) float64 array
+     * @returns {number[][]} Solutions
+     */
+    readSolutionsBuffer(solutionsProxy) {
+        const buffer = solutionsProxy.getBuffer('f64');
+        try {
+            const [popsize, ndim] = buffer.shape;
+            const [rowStride, colStride] = buffer.strides;
+            const solutions = new Array(popsize);
+            for (let i = 0; i < popsize; i++) {
+                const solution = new Array(ndim);
+                for (let j = 0; j < ndim; j++) {
+                    solution[j] = buffer.data[buffer.offset + i * rowStride + j * colStride];
+                }
+                solutions[i] = solution;
+            }
+            return solutions;
+        } finally {
+            buffer.release();
+            solutionsProxy.destroy();
+        }
+    }
+
     /**
      * Transform user constraints to ConstrainedFitnessAL format (g(x) ≤ 0)
      *
@@ -76,6 +76,29 @@ export class ProgressTracker {
         return false;
     }
 
+    /**
+     * Change the total number of evaluations expected (e.g. when a CMA-ES
+     * restart changes the population size). The progress is recomputed and
+     * the next update() notifies.
+     *
+     * @param {number} maxEvaluations - New total number of evaluations expected
+     *
+     * @example
+     * const tracker = new ProgressTracker(1000, 1);
+     * tracker.update(500);  // 50%
+     * tracker.resize(1500); // 33.3%, next update() returns true
+     */
+    resize(maxEvaluations) {
+        if (maxEvaluations <= 0) {
+            throw new Error('maxEvaluations must be greater than 0');
+        }
+
+        this.maxEvaluations = maxEvaluations;
+        this.currentProgress.maxEvaluations = maxEvaluations;
+        this.currentProgress.percent = (this.currentProgress.evaluations / maxEvaluations) * 100;
+        this.lastNotifiedThreshold = Math.floor(this.currentProgress.percent / this.step) - 1;
+    }
+
     /**
      * Reset progress tracker to initial state.
      * Useful when starting a new optimization run.
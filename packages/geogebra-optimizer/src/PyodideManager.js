@@ -11,6 +11,7 @@ export class PyodideManager extends EventBus {
         this.options = {
             indexURL: 'https://cdn.jsdelivr.net/pyodide/v0.24.1/full/',
             packages: ['micropip', 'numpy'],
+            micropipPackages: ['cma'],
             ...options
         };
     }
@@ -30,9 +31,9 @@ export class PyodideManager extends EventBus {
             // Load basic packages
             await this.pyodide.loadPackage(this.options.packages);
 
-            // Install CMA-ES
+            // Install CMA-ES (and optional backends such as 'cmaes')
             const micropip = this.pyodide.pyimport('micropip');
-            await micropip.install('cma');
+            await micropip.install(this.options.micropipPackages);
 
             this.emit('pyodide:ready', {});
             return this.pyodide;